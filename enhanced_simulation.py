@@ -16,15 +16,33 @@ Features:
 
 import cv2
 import time
+import queue
 import logging
 import threading
+import multiprocessing
 import numpy as np
+from collections import deque
+from multiprocessing import shared_memory
 from typing import Optional, Tuple, Dict, Any
 from dataclasses import dataclass
 from enum import Enum
 
 logger = logging.getLogger('EagleWings.Simulation')
 
+# Tello camera frames are 960x720 BGR; each detection worker shared memory slot holds one
+MAX_FRAME_BYTES = 960 * 720 * 3
+
+# Tello sends raw H.264 over UDP; decodebin picks a hardware decoder (VAAPI, nvv4l2, ...) when present
+DEFAULT_GSTREAMER_PIPELINE = (
+    "udpsrc port=11111 ! video/x-h264,stream-format=byte-stream ! h264parse ! decodebin ! "
+    "videoconvert ! video/x-raw,format=BGR ! appsink drop=1 max-buffers=1 sync=false"
+)
+
+# ArUco dictionaries and detectors shared by every simulation instance in the process
+_DICTIONARY_CACHE: Dict[int, Any] = {}
+_DETECTOR_CACHE: Dict[Tuple, Any] = {}
+_DETECTOR_CACHE_LOCK = threading.Lock()
+
 class BatteryStatus(Enum):
     """Battery status enumeration"""
     NORMAL = "normal"
@@ -47,6 +65,380 @@ class ArUcoConfig:
     marker_size: float = 0.05  # 5cm
     search_timeout: float = 30.0  # 30 seconds to find marker
     approach_distance: int = 30  # 30cm approach distance
+    detection_scale: float = 0.5  # Downscale factor for the global search pass
+    roi_padding: float = 0.5  # Pad the tracked marker box by half its size plus one threshold window
+    roi_max_misses: int = 5  # ROI misses before falling back to full-frame search
+    camera_focal_length: float = 920.0  # Tello camera focal length in pixels at 960x720
+    adaptive_thresh_win_size: int = 13  # Single adaptive threshold window
+    corner_refinement_method: int = cv2.aruco.CORNER_REFINE_NONE
+    min_marker_perimeter_rate: float = 0.05
+    polygonal_approx_accuracy_rate: float = 0.05
+    use_detection_process: bool = False  # Run marker detection in a worker process
+    detection_timeout: float = 1.0  # Seconds to wait for a worker result
+    detection_startup_timeout: float = 30.0  # Seconds to wait for the worker to import cv2 and get ready
+    min_stddev: float = 0.0  # Skip detection when no tile of the downscaled frame has this grayscale stddev (0 = off)
+
+class GStreamerFrameRead:
+    """Background reader for the Tello video stream through an OpenCV GStreamer capture.
+    
+    Mirrors djitellopy's BackgroundFrameRead: the newest decoded frame is exposed as .frame
+    and is replaced by a new array for every decoded frame.
+    """
+    
+    def __init__(self, pipeline: str, read_timeout_ms: int = 500):
+        self.frame = None
+        self.stopped = False
+        self.read_timeout_ms = read_timeout_ms
+        # Bound read() so a silent stream cannot block the worker forever and keep udpsrc bound
+        self.capture = cv2.VideoCapture(pipeline, cv2.CAP_GSTREAMER, [
+            cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, 5000,
+            cv2.CAP_PROP_READ_TIMEOUT_MSEC, read_timeout_ms
+        ])
+        self.worker = threading.Thread(target=self._update_frame, daemon=True, name="GStreamerFrameRead")
+    
+    def is_opened(self) -> bool:
+        """Whether OpenCV was built with GStreamer and the pipeline started"""
+        return self.capture.isOpened()
+    
+    def start(self):
+        """Start the frame update worker"""
+        self.worker.start()
+    
+    def _update_frame(self):
+        """Worker loop; read() returns the next frame or gives up after read_timeout_ms"""
+        while not self.stopped:
+            ok, frame = self.capture.read()
+            if ok:
+                self.frame = frame
+            else:
+                # After EOS or a pipeline error read() fails immediately; don't spin
+                time.sleep(0.01)
+    
+    def stop(self):
+        """Stop the worker and release the capture"""
+        self.stopped = True
+        if self.worker.is_alive():
+            self.worker.join(timeout=2 * self.read_timeout_ms / 1000.0 + 1.0)
+        if self.worker.is_alive():
+            # Only reachable if OpenCV ignores the read timeout; never release under a running read()
+            logger.warning("[SIMULATION] GStreamer reader did not stop; capture left open")
+            return
+        self.capture.release()
+
+class MarkerDetector:
+    """Frame-to-markers pipeline: a downscaled global search, then ROI tracking of the last hit.
+    
+    Holds the tracking state and reusable image buffers; runs in-process or inside a
+    DetectionWorker process.
+    """
+    
+    STDDEV_TILE = 16  # Flat-frame check tile size, in downscaled pixels
+    
+    def __init__(self, aruco_config: ArUcoConfig):
+        self.config = aruco_config
+        self.detector = _get_aruco_detector(aruco_config)
+        
+        # ROI tracking state
+        self.last_bbox = None
+        self.frame_size = None
+        self.roi_misses = 0
+        
+        # Reused image buffers so the search loop does not allocate per frame
+        self._small = None
+        self._gray_small = None
+        self._gray_roi = None
+        self._gray_float = None
+        self._gray_sq = None
+        self._tile_mean = None
+        self._tile_sq = None
+    
+    def detect(self, frame):
+        """Detect markers in a BGR frame, returning (corners, ids) in frame coordinates"""
+        if self.last_bbox is not None:
+            corners, ids = self.decode_roi(frame, self.last_bbox)
+            if ids is None:
+                self.roi_misses += 1
+                if self.roi_misses >= self.config.roi_max_misses:
+                    logger.debug("[SIMULATION] Tracked marker lost, falling back to full-frame search")
+                    self.reset()
+                return corners, None
+        else:
+            corners, ids = self.detect_global(frame)
+        
+        if ids is not None:
+            self.last_bbox = self.marker_bbox(corners, frame.shape)
+            self.frame_size = frame.shape[:2]
+            self.roi_misses = 0
+        
+        return corners, ids
+    
+    def detect_global(self, frame):
+        """Search a downscaled copy of the whole frame for markers"""
+        scale = self.config.detection_scale
+        height, width = frame.shape[:2]
+        small_size = (int(width * scale), int(height * scale))
+        
+        if self._small is None or self._small.shape[:2] != (small_size[1], small_size[0]):
+            self._small = np.empty((small_size[1], small_size[0], 3), dtype=np.uint8)
+            self._gray_small = np.empty((small_size[1], small_size[0]), dtype=np.uint8)
+        
+        cv2.resize(frame, small_size, self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, self._gray_small)
+        
+        if self._is_flat(self._gray_small):
+            return (), None
+        
+        corners, ids, _ = self.detector.detectMarkers(self._gray_small)
+        
+        if ids is None:
+            return corners, None
+        
+        # Map corners back to full-resolution frame coordinates
+        return tuple(corner / scale for corner in corners), ids
+    
+    def _is_flat(self, gray) -> bool:
+        """Whether no tile of gray has enough contrast to hold a marker"""
+        min_stddev = self.config.min_stddev
+        if min_stddev <= 0:
+            return False
+        
+        # Cheap whole-frame check first; textured frames never pay for the tiled pass
+        _, stddev = cv2.meanStdDev(gray)
+        if stddev[0, 0] >= min_stddev:
+            return False
+        
+        # A small marker barely moves the whole-frame stddev of a plain wall, but dominates its tile
+        tiles = (max(gray.shape[1] // self.STDDEV_TILE, 1), max(gray.shape[0] // self.STDDEV_TILE, 1))
+        if self._gray_float is None or self._gray_float.shape != gray.shape:
+            self._gray_float = np.empty(gray.shape, dtype=np.float32)
+            self._gray_sq = np.empty(gray.shape, dtype=np.float32)
+            self._tile_mean = np.empty((tiles[1], tiles[0]), dtype=np.float32)
+            self._tile_sq = np.empty((tiles[1], tiles[0]), dtype=np.float32)
+        
+        np.copyto(self._gray_float, gray)
+        cv2.multiply(self._gray_float, self._gray_float, self._gray_sq)
+        cv2.resize(self._gray_float, tiles, self._tile_mean, interpolation=cv2.INTER_AREA)
+        cv2.resize(self._gray_sq, tiles, self._tile_sq, interpolation=cv2.INTER_AREA)
+        # Per-tile variance: E[x^2] - E[x]^2
+        cv2.multiply(self._tile_mean, self._tile_mean, self._tile_mean)
+        cv2.subtract(self._tile_sq, self._tile_mean, self._tile_sq)
+        _, max_variance, _, _ = cv2.minMaxLoc(self._tile_sq)
+        return max_variance < min_stddev * min_stddev
+    
+    def decode_roi(self, frame, bbox):
+        """Detect markers only inside the tracked bounding box"""
+        x0, y0, x1, y1 = bbox
+        if x1 <= x0 or y1 <= y0:
+            return (), None
+        
+        # ROI sizes vary per frame, so carve a contiguous view out of one frame-sized buffer
+        if self._gray_roi is None or self._gray_roi.size < frame.shape[0] * frame.shape[1]:
+            self._gray_roi = np.empty(frame.shape[0] * frame.shape[1], dtype=np.uint8)
+        
+        gray = self._gray_roi[:(y1 - y0) * (x1 - x0)].reshape(y1 - y0, x1 - x0)
+        cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_BGR2GRAY, gray)
+        corners, ids, _ = self.detector.detectMarkers(gray)
+        
+        if ids is None:
+            return corners, None
+        
+        offset = np.array([x0, y0], dtype=np.float32)
+        return tuple(corner + offset for corner in corners), ids
+    
+    def marker_bbox(self, corners, frame_shape) -> Tuple[int, int, int, int]:
+        """Padded bounding box around all detected marker corners"""
+        points = np.concatenate([corner.reshape(-1, 2) for corner in corners])
+        x0, y0 = points.min(axis=0)
+        x1, y1 = points.max(axis=0)
+        
+        # A crop edge landing on the quiet-zone boundary gets the marker rejected; half the
+        # marker size plus one threshold window clears it for quiet zones up to a marker wide
+        pad_x = (x1 - x0) * self.config.roi_padding + self.config.adaptive_thresh_win_size
+        pad_y = (y1 - y0) * self.config.roi_padding + self.config.adaptive_thresh_win_size
+        height, width = frame_shape[:2]
+        
+        return (
+            max(int(x0 - pad_x), 0),
+            max(int(y0 - pad_y), 0),
+            min(int(x1 + pad_x) + 1, width),
+            min(int(y1 + pad_y) + 1, height)
+        )
+    
+    def predict_after_approach(self, distance_cm: float):
+        """Scale the tracked box for a forward move of distance_cm toward the marker"""
+        if self.last_bbox is None:
+            return
+        
+        x0, y0, x1, y1 = self.last_bbox
+        height, width = self.frame_size
+        
+        # Pinhole range estimate from the marker's apparent width (the box includes padding)
+        marker_px = (x1 - x0 - 2 * self.config.adaptive_thresh_win_size) / (1 + 2 * self.config.roi_padding)
+        if marker_px <= 0:
+            self.reset()
+            return
+        range_m = self.config.camera_focal_length * self.config.marker_size / marker_px
+        remaining_m = range_m - distance_cm / 100.0
+        if remaining_m <= self.config.marker_size:
+            # Marker is about to fill the view; a full-frame search is cheaper than guessing
+            self.reset()
+            return
+        
+        # Moving straight ahead, image points expand away from the principal point
+        scale = range_m / remaining_m
+        cx, cy = width / 2.0, height / 2.0
+        self.last_bbox = (
+            max(int(cx + (x0 - cx) * scale), 0),
+            max(int(cy + (y0 - cy) * scale), 0),
+            min(int(cx + (x1 - cx) * scale) + 1, width),
+            min(int(cy + (y1 - cy) * scale) + 1, height)
+        )
+        self.roi_misses = 0
+    
+    def reset(self):
+        """Forget the tracked marker so the next frame runs a full search"""
+        self.last_bbox = None
+        self.frame_size = None
+        self.roi_misses = 0
+
+class DetectionWorker:
+    """MarkerDetector in a separate process, fed BGR frames through shared memory.
+    
+    Two frame slots let the caller copy in frame N while the worker detects frame N-1, so
+    resizing, colour conversion and detection all run off the caller's core and GIL.
+    """
+    
+    SLOTS = 2
+    
+    def __init__(self, aruco_config: ArUcoConfig, slot_size: int = MAX_FRAME_BYTES):
+        self.slot_size = slot_size
+        self.timeout = aruco_config.detection_timeout
+        # Spawn rather than fork: the parent runs the djitellopy reader and monitor threads
+        context = multiprocessing.get_context("spawn")
+        self._shm = shared_memory.SharedMemory(create=True, size=slot_size * self.SLOTS)
+        self._slots = [
+            np.ndarray((slot_size,), dtype=np.uint8, buffer=self._shm.buf, offset=slot * slot_size)
+            for slot in range(self.SLOTS)
+        ]
+        self._pending = deque()  # (slot, frame) per submitted frame, oldest first
+        self._requests = context.Queue()
+        self._results = context.Queue()
+        self._process = context.Process(
+            target=_detection_worker_main,
+            args=(self._shm.name, slot_size, aruco_config, self._requests, self._results),
+            daemon=True,
+            name="ArUcoDetector"
+        )
+        self._process.start()
+        
+        # Spawning an interpreter and importing cv2 can take seconds on small boards
+        deadline = time.monotonic() + aruco_config.detection_startup_timeout
+        ready = None
+        while ready is None and time.monotonic() < deadline:
+            try:
+                ready = self._results.get(timeout=0.1)
+            except queue.Empty:
+                # A child that died before reaching its entry point cannot report why
+                if not self._process.is_alive():
+                    break
+        if ready != "ready":
+            exited = not self._process.is_alive()
+            self.stop()
+            if isinstance(ready, Exception):
+                raise RuntimeError(f"detection worker failed to start: {ready}")
+            if exited:
+                raise RuntimeError(f"detection worker exited during startup (exit code {self._process.exitcode})")
+            raise RuntimeError(f"detection worker not ready after {aruco_config.detection_startup_timeout}s")
+    
+    @property
+    def in_flight(self) -> int:
+        """Number of submitted frames whose result has not been collected"""
+        return len(self._pending)
+    
+    @property
+    def busy(self) -> bool:
+        """Whether every slot holds a frame; collect() before the next submit()"""
+        return len(self._pending) >= self.SLOTS
+    
+    def submit(self, frame):
+        """Copy frame into a free slot and queue it for detection"""
+        if frame.nbytes > self.slot_size:
+            raise ValueError(f"frame of {frame.nbytes} bytes exceeds the {self.slot_size} byte slot")
+        in_use = {slot for slot, _ in self._pending}
+        slot = next(slot for slot in range(self.SLOTS) if slot not in in_use)
+        self._slots[slot][:frame.nbytes].reshape(frame.shape)[...] = frame
+        self._requests.put(("detect", slot, frame.shape))
+        self._pending.append((slot, frame))
+    
+    def collect(self):
+        """Wait for the oldest submitted frame's result; returns (frame, corners, ids)"""
+        result = self._results.get(timeout=self.timeout)
+        _, frame = self._pending.popleft()
+        if isinstance(result, Exception):
+            raise result
+        corners, ids = result
+        return frame, corners, ids
+    
+    def reset_tracking(self):
+        """Forget the worker's tracked marker"""
+        self._requests.put(("reset",))
+    
+    def predict_after_approach(self, distance_cm: float):
+        """Scale the worker's tracked box for a forward move"""
+        self._requests.put(("approach", distance_cm))
+    
+    def stop(self):
+        """Stop the worker process and release the shared memory"""
+        try:
+            self._requests.put(None)
+            self._process.join(timeout=2.0)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join()
+        finally:
+            self._requests.close()
+            self._results.close()
+            del self._slots
+            self._shm.close()
+            self._shm.unlink()
+
+def _detection_worker_main(shm_name: str, slot_size: int, aruco_config: ArUcoConfig, requests, results):
+    """Detection worker process entry point"""
+    shm = None
+    try:
+        shm = shared_memory.SharedMemory(name=shm_name)
+        marker_detector = MarkerDetector(aruco_config)
+    except Exception as e:
+        # Report the failure rather than leaving the parent waiting out its startup timeout
+        if shm is not None:
+            shm.close()
+        results.put(RuntimeError(repr(e)))
+        return
+    
+    try:
+        results.put("ready")
+        while True:
+            request = requests.get()
+            if request is None:
+                break
+            
+            kind = request[0]
+            if kind == "detect":
+                _, slot, shape = request
+                frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=slot * slot_size)
+                try:
+                    results.put(marker_detector.detect(frame))
+                except Exception as e:
+                    # Every detect request gets exactly one reply so results stay paired with frames
+                    results.put(RuntimeError(repr(e)))
+                # Drop the view before the next request, or shm.close() fails on exit
+                del frame
+            elif kind == "reset":
+                marker_detector.reset()
+            elif kind == "approach":
+                marker_detector.predict_after_approach(request[1])
+    finally:
+        shm.close()
 
 class EnhancedSimulation:
     """Enhanced simulation module with battery monitoring and ArUco detection"""
@@ -62,35 +454,62 @@ class EnhancedSimulation:
         self.tello = tello_instance
         self.config = config or {}
         
+        # Resolve optional Tello capabilities once; the instance never changes
+        self._get_battery = getattr(tello_instance, 'get_battery', None)
+        self._rotate_cw = getattr(tello_instance, 'rotate_clockwise', None)
+        self._streamon = getattr(tello_instance, 'streamon', None)
+        self._move_forward = getattr(tello_instance, 'move_forward', None)
+        self._get_frame_read = getattr(tello_instance, 'get_frame_read', None)
+        self.debug_draw = self.config.get('debug_draw', False)
+        self.use_gstreamer = self.config.get('use_gstreamer', False)
+        self.gstreamer_pipeline = self.config.get('gstreamer_pipeline', DEFAULT_GSTREAMER_PIPELINE)
+        
         self.battery_config = BatteryConfig(
             warning_threshold=self.config.get('warning_threshold', 20),
             critical_threshold=self.config.get('critical_threshold', 10),
             charging_threshold=self.config.get('charging_threshold', 5),
             check_interval=self.config.get('check_interval', 5.0)
         )
+        self._build_status_thresholds()
         
         self.aruco_config = ArUcoConfig(
             dictionary_type=self.config.get('aruco_dict', cv2.aruco.DICT_4X4_50),
             marker_size=self.config.get('marker_size', 0.05),
             search_timeout=self.config.get('search_timeout', 30.0),
-            approach_distance=self.config.get('approach_distance', 30)
+            approach_distance=self.config.get('approach_distance', 30),
+            detection_scale=self.config.get('detection_scale', 0.5),
+            roi_padding=self.config.get('roi_padding', 0.5),
+            roi_max_misses=self.config.get('roi_max_misses', 5),
+            camera_focal_length=self.config.get('camera_focal_length', 920.0),
+            adaptive_thresh_win_size=self.config.get('adaptive_thresh_win_size', 13),
+            corner_refinement_method=self.config.get('corner_refinement_method', cv2.aruco.CORNER_REFINE_NONE),
+            min_marker_perimeter_rate=self.config.get('min_marker_perimeter_rate', 0.05),
+            polygonal_approx_accuracy_rate=self.config.get('polygonal_approx_accuracy_rate', 0.05),
+            use_detection_process=self.config.get('use_detection_process', False),
+            detection_timeout=self.config.get('detection_timeout', 1.0),
+            detection_startup_timeout=self.config.get('detection_startup_timeout', 30.0),
+            min_stddev=self.config.get('min_stddev', 0.0)
         )
         
-        self.aruco_dict = cv2.aruco.getPredefinedDictionary(self.aruco_config.dictionary_type)
-        self.aruco_detector = cv2.aruco.ArucoDetector(
-            self.aruco_dict, 
-            cv2.aruco.DetectorParameters()
-        )
+        self.aruco_dict = _get_aruco_dictionary(self.aruco_config.dictionary_type)
+        self.marker_detector = MarkerDetector(self.aruco_config)
+        self.aruco_detector = self.marker_detector.detector
         
         self.is_running = False
         self.is_monitoring = False
         self.current_battery_status = BatteryStatus.NORMAL
+        self._status_str = BatteryStatus.NORMAL.value
         self.last_battery_level = 100
+        self._last_battery_ts = None  # time.monotonic() of the last processed reading
         self.charging_spot_found = False
         self.charging_spot_position = None
         
+        self.detection_worker = None
+        self.gstreamer_reader = None
+        
         self.monitor_thread = None
         self.lock = threading.Lock()
+        self._stop_event = threading.Event()
         
         self.battery_callback = None
         self.charging_callback = None
@@ -111,7 +530,12 @@ class EnhancedSimulation:
             logger.warning("[SIMULATION] Battery monitoring already running")
             return False
         
+        # Start the worker now, not when a critical battery triggers the search on the monitor thread
+        if self.aruco_config.use_detection_process:
+            self._start_detection_worker()
+        
         self.is_monitoring = True
+        self._stop_event.clear()
         self.monitor_thread = threading.Thread(
             target=self._battery_monitor_loop,
             daemon=True,
@@ -124,6 +548,7 @@ class EnhancedSimulation:
     def stop_monitoring(self):
         """Stop battery monitoring"""
         self.is_monitoring = False
+        self._stop_event.set()
         if self.monitor_thread and self.monitor_thread.is_alive():
             self.monitor_thread.join(timeout=2.0)
         logger.info("[SIMULATION] Battery monitoring stopped")
@@ -136,55 +561,67 @@ class EnhancedSimulation:
                 if battery_level is not None:
                     self._process_battery_level(battery_level)
                 
-                time.sleep(self.battery_config.check_interval)
+                if self._stop_event.wait(self.battery_config.check_interval):
+                    break
             except Exception as e:
                 logger.error(f"[SIMULATION] Battery monitoring error: {e}")
-                time.sleep(1.0)
+                if self._stop_event.wait(1.0):
+                    break
     
     def _get_battery_level(self) -> Optional[int]:
         """Get current battery level with error handling"""
         try:
-            if hasattr(self.tello, 'get_battery'):
-                battery = self.tello.get_battery()
+            if self._get_battery:
+                battery = self._get_battery()
                 if battery is not None and 0 <= battery <= 100:
-                    logger.debug(f"[SIMULATION] Battery level retrieved: {battery}%")
+                    logger.debug("[SIMULATION] Battery level retrieved: %s%%", battery)
                     return battery
                 else:
-                    logger.warning(f"[SIMULATION] Invalid battery level: {battery}")
+                    logger.warning("[SIMULATION] Invalid battery level: %s", battery)
             else:
                 logger.warning("[SIMULATION] Tello instance does not have get_battery method")
         except Exception as e:
-            logger.warning(f"[SIMULATION] Battery read error: {e}")
+            logger.warning("[SIMULATION] Battery read error: %s", e)
         return None
     
     def _process_battery_level(self, battery_level: int):
         """Process battery level and determine status"""
         with self.lock:
             self.last_battery_level = battery_level
+            self._last_battery_ts = time.monotonic()
             
-            if battery_level <= self.battery_config.charging_threshold:
-                new_status = BatteryStatus.CRITICAL
-            elif battery_level <= self.battery_config.critical_threshold:
+            # Most severe status whose threshold is met, whatever order the thresholds are in
+            if battery_level <= self._critical_limit:
                 new_status = BatteryStatus.CRITICAL
-            elif battery_level <= self.battery_config.warning_threshold:
+            elif battery_level <= self._warning_limit:
                 new_status = BatteryStatus.WARNING
             else:
                 new_status = BatteryStatus.NORMAL
             
-            if new_status != self.current_battery_status:
-                old_status = self.current_battery_status
-                self.current_battery_status = new_status
-                
-                logger.info(f"[SIMULATION] Battery status changed: {old_status.value} -> {new_status.value} ({battery_level}%)")
-                
-                if self.battery_callback:
-                    try:
-                        self.battery_callback(battery_level, new_status)
-                    except Exception as e:
-                        logger.error(f"[SIMULATION] Battery callback error: {e}")
-                
-                if new_status == BatteryStatus.CRITICAL:
-                    self._handle_critical_battery()
+            old_status = self.current_battery_status
+            if new_status == old_status:
+                return
+            self.current_battery_status = new_status
+            self._status_str = new_status.value
+        
+        # Callbacks and the charging search run outside the lock: the search updates
+        # the charging spot under it, and get_status() must not block for its duration
+        logger.info(f"[SIMULATION] Battery status changed: {old_status.value} -> {new_status.value} ({battery_level}%)")
+        
+        if self.battery_callback:
+            try:
+                self.battery_callback(battery_level, new_status)
+            except Exception as e:
+                logger.error(f"[SIMULATION] Battery callback error: {e}")
+        
+        if new_status == BatteryStatus.CRITICAL:
+            self._handle_critical_battery()
+    
+    def _build_status_thresholds(self):
+        """Precompute the battery levels at or below which each status applies"""
+        # The charging threshold also maps to CRITICAL, so the larger of the two wins
+        self._critical_limit = max(self.battery_config.charging_threshold, self.battery_config.critical_threshold)
+        self._warning_limit = self.battery_config.warning_threshold
     
     def _handle_critical_battery(self):
         """Handle critical battery situation"""
@@ -202,24 +639,21 @@ class EnhancedSimulation:
         """Search for ArUco marker charging spot"""
         logger.info("[SIMULATION] Starting charging spot search...")
         
-        if not hasattr(self.tello, 'get_frame_read'):
+        if not self._get_frame_read:
             logger.error("[SIMULATION] Tello camera not available for charging spot search")
             return False
         
         try:
-            if hasattr(self.tello, 'streamon'):
-                self.tello.streamon()
+            if self._streamon:
+                self._streamon()
             
-            frame_reader = self.tello.get_frame_read()
+            frame_reader = self._open_frame_reader()
+            self._reset_marker_tracking()
             start_time = time.time()
             
             while time.time() - start_time < self.aruco_config.search_timeout:
-                frame = frame_reader.frame
-                if frame is None:
-                    time.sleep(0.1)
-                    continue
-                
-                markers_found = self._detect_aruco_markers(frame)
+                # Keep detecting on incoming frames while the camera settles, rather than sleeping
+                markers_found = self._scan_for(frame_reader, 1.0)
                 
                 if markers_found:
                     logger.info("[SIMULATION] ArUco marker found! Approaching charging spot...")
@@ -227,9 +661,10 @@ class EnhancedSimulation:
                         logger.info("[SIMULATION] Successfully reached charging spot!")
                         return True
                 
-                if hasattr(self.tello, 'rotate_clockwise'):
-                    self.tello.rotate_clockwise(30)
-                time.sleep(1.0)
+                if self._rotate_cw:
+                    self._rotate_cw(30)
+                    # After a rotation the marker is no longer where it was tracked
+                    self._reset_marker_tracking()
             
             logger.warning("[SIMULATION] Charging spot not found within timeout")
             return False
@@ -237,43 +672,179 @@ class EnhancedSimulation:
         except Exception as e:
             logger.error(f"[SIMULATION] Charging spot search error: {e}")
             return False
+        finally:
+            # The detection worker stays up for later searches; cleanup() stops it
+            self._stop_gstreamer_reader()
     
-    def _detect_aruco_markers(self, frame) -> bool:
-        """Detect ArUco markers in frame"""
-        try:
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            corners, ids, _ = self.aruco_detector.detectMarkers(gray)
+    def _open_frame_reader(self):
+        """Open the hardware-decoded GStreamer stream if enabled, else djitellopy's reader"""
+        if self.use_gstreamer:
+            reader = GStreamerFrameRead(self.gstreamer_pipeline)
+            if reader.is_opened():
+                reader.start()
+                self.gstreamer_reader = reader
+                logger.info("[SIMULATION] Reading video through GStreamer")
+                return reader
+            reader.stop()
+            logger.warning("[SIMULATION] GStreamer pipeline unavailable, using djitellopy frame reader")
+        
+        return self._get_frame_read()
+    
+    def _stop_gstreamer_reader(self):
+        """Stop the GStreamer frame reader if one was opened"""
+        reader, self.gstreamer_reader = self.gstreamer_reader, None
+        if reader is not None:
+            reader.stop()
+    
+    def _scan_for(self, frame_reader, duration: float) -> bool:
+        """Run detection on each new frame until a marker is seen or duration elapses"""
+        worker = self.detection_worker
+        if worker is not None:
+            try:
+                return self._scan_with_worker(worker, frame_reader, duration)
+            except Exception as e:
+                logger.warning("[SIMULATION] Detection worker failed, detecting in-process: %r", e)
+                self._stop_detection_worker()
+                self.marker_detector.reset()
+        
+        deadline = time.monotonic() + duration
+        last_frame = None
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
             
-            if ids is not None:
-                cv2.aruco.drawDetectedMarkers(frame, corners, ids)
+            frame = self._wait_for_new_frame(frame_reader, last_frame, timeout=min(remaining, 0.1))
+            if frame is None:
+                continue
+            last_frame = frame
+            
+            if self._detect_aruco_markers(frame):
+                return True
+    
+    def _scan_with_worker(self, worker, frame_reader, duration: float) -> bool:
+        """_scan_for through the detection worker, detecting frame N-1 while frame N is copied in"""
+        deadline = time.monotonic() + duration
+        last_frame = None
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
                 
-                for i, corner in enumerate(corners):
-                    center = np.mean(corner[0], axis=0)
-                    self.charging_spot_position = center
-                    self.charging_spot_found = True
-                    
-                    marker_id = ids[i][0] if ids is not None else "unknown"
-                    logger.info(f"[SIMULATION] ArUco marker {marker_id} detected at position {center}")
+                frame = self._wait_for_new_frame(frame_reader, last_frame, timeout=min(remaining, 0.1))
+                if frame is None:
+                    continue
+                last_frame = frame
                 
-                return True
+                worker.submit(frame)
+                if worker.busy and self._handle_detection(*worker.collect()):
+                    return True
             
+            # The last frames of the window still count
+            while worker.in_flight:
+                if self._handle_detection(*worker.collect()):
+                    return True
             return False
-            
+        finally:
+            # Leave nothing in flight so the next scan starts in step with the worker
+            while worker.in_flight:
+                worker.collect()
+    
+    def _wait_for_new_frame(self, frame_reader, last_frame, timeout: float = 0.1):
+        """Wait for the reader to publish a frame other than last_frame"""
+        deadline = time.monotonic() + timeout
+        while True:
+            frame = frame_reader.frame
+            # The reader swaps in a new array per decoded frame, so identity means "already seen"
+            if frame is not None and frame is not last_frame:
+                return frame
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(1 / 60)
+    
+    def _detect_aruco_markers(self, frame) -> bool:
+        """Detect ArUco markers in frame, tracking the last hit with an ROI"""
+        try:
+            corners, ids = self.marker_detector.detect(frame)
+            return self._handle_detection(frame, corners, ids)
         except Exception as e:
-            logger.error(f"[SIMULATION] ArUco detection error: {e}")
+            logger.error("[SIMULATION] ArUco detection error: %s", e)
+            return False
+    
+    def _handle_detection(self, frame, corners, ids) -> bool:
+        """Record the charging spot from a detection result; True if a marker was found"""
+        if ids is None:
             return False
+        
+        if self.debug_draw:
+            cv2.aruco.drawDetectedMarkers(frame, corners, ids)
+        
+        # (N, 4, 2) corner stack -> (N, 2) centers in a single reduction
+        quads = np.stack([corner[0] for corner in corners])
+        centers = quads.mean(axis=1)
+        
+        # Shoelace areas; the largest marker is the closest one
+        x, y = quads[..., 0], quads[..., 1]
+        areas = 0.5 * np.abs(np.sum(x * np.roll(y, -1, axis=1) - np.roll(x, -1, axis=1) * y, axis=1))
+        
+        with self.lock:
+            self.charging_spot_position = centers[np.argmax(areas)]
+            self.charging_spot_found = True
+        
+        # Runs at frame rate during a search; skip the array conversions when INFO is off
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("[SIMULATION] ArUco markers %s detected at positions %s",
+                        ids.ravel().tolist(), centers.tolist())
+        
+        return True
+    
+    def _start_detection_worker(self):
+        """Start the detection worker process"""
+        if self.detection_worker is not None:
+            return
+        try:
+            self.detection_worker = DetectionWorker(self.aruco_config)
+            logger.info("[SIMULATION] ArUco detection worker process started")
+        except Exception as e:
+            logger.warning(f"[SIMULATION] Could not start detection worker, detecting in-process: {e}")
+    
+    def _stop_detection_worker(self):
+        """Stop the detection worker process if running"""
+        worker, self.detection_worker = self.detection_worker, None
+        if worker is None:
+            return
+        try:
+            worker.stop()
+            logger.info("[SIMULATION] ArUco detection worker process stopped")
+        except Exception as e:
+            logger.warning(f"[SIMULATION] Detection worker shutdown error: {e}")
+    
+    def _reset_marker_tracking(self):
+        """Forget the tracked marker so the next frame runs a full search"""
+        self.marker_detector.reset()
+        if self.detection_worker is not None:
+            self.detection_worker.reset_tracking()
+    
+    def _predict_bbox_after_approach(self, distance_cm: float):
+        """Move the tracked marker box to where a forward move will put it"""
+        self.marker_detector.predict_after_approach(distance_cm)
+        if self.detection_worker is not None:
+            self.detection_worker.predict_after_approach(distance_cm)
     
     def _approach_charging_spot(self, frame_reader) -> bool:
         """Approach the detected charging spot"""
         try:
             approach_distance = self.aruco_config.approach_distance
             
-            if hasattr(self.tello, 'move_forward'):
-                self.tello.move_forward(approach_distance)
+            if self._move_forward:
+                self._move_forward(approach_distance)
+                # Keep tracking the marker through the move: it grows by a predictable factor
+                self._predict_bbox_after_approach(approach_distance)
                 time.sleep(2.0)  # Allow time for movement
             
-            frame = frame_reader.frame
-            if frame is not None and self._detect_aruco_markers(frame):
+            # Confirm on the following frames; after roi_max_misses the scan falls back to full-frame
+            if self._scan_for(frame_reader, 1.0):
                 logger.info("[SIMULATION] Successfully approached charging spot")
                 return True
             
@@ -289,7 +860,7 @@ class EnhancedSimulation:
             return {
                 "is_monitoring": self.is_monitoring,
                 "battery_level": self.last_battery_level,
-                "battery_status": self.current_battery_status.value,
+                "battery_status": self._status_str,
                 "charging_spot_found": self.charging_spot_found,
                 "charging_spot_position": self.charging_spot_position,
                 "config": {
@@ -301,7 +872,12 @@ class EnhancedSimulation:
     
     def get_battery_info(self) -> Dict[str, Any]:
         """Get detailed battery information"""
-        battery_level = self._get_battery_level()
+        # Reuse the monitor's reading while it is fresh instead of querying the drone again
+        last_ts = self._last_battery_ts
+        if last_ts is not None and time.monotonic() - last_ts < self.battery_config.check_interval:
+            battery_level = self.last_battery_level
+        else:
+            battery_level = self._get_battery_level()
         
         if battery_level is None:
             battery_level = self.last_battery_level
@@ -309,12 +885,12 @@ class EnhancedSimulation:
         
         return {
             "current_level": battery_level,
-            "status": self.current_battery_status.value,
+            "status": self._status_str,
             "warning_threshold": self.battery_config.warning_threshold,
             "critical_threshold": self.battery_config.critical_threshold,
             "charging_threshold": self.battery_config.charging_threshold,
             "is_low": battery_level is not None and battery_level <= self.battery_config.warning_threshold,
-            "is_critical": battery_level is not None and battery_level <= self.battery_config.critical_threshold
+            "is_critical": battery_level is not None and battery_level <= self._critical_limit
         }
     
     def manual_charging_search(self) -> bool:
@@ -334,6 +910,7 @@ class EnhancedSimulation:
             if 'check_interval' in new_config:
                 self.battery_config.check_interval = new_config['check_interval']
             
+            self._build_status_thresholds()
             logger.info(f"[SIMULATION] Configuration updated: {new_config}")
     
     def reset_charging_spot_status(self):
@@ -341,14 +918,55 @@ class EnhancedSimulation:
         with self.lock:
             self.charging_spot_found = False
             self.charging_spot_position = None
+            self._reset_marker_tracking()
             logger.info("[SIMULATION] Charging spot status reset")
     
     def cleanup(self):
         """Cleanup resources"""
         self.stop_monitoring()
+        self._stop_detection_worker()
+        self._stop_gstreamer_reader()
         logger.info("[SIMULATION] Enhanced simulation module cleaned up")
 
 
+def create_detector_parameters(aruco_config: ArUcoConfig) -> cv2.aruco.DetectorParameters:
+    """Build fast video-rate detector parameters from the ArUco config"""
+    params = cv2.aruco.DetectorParameters()
+    # A single adaptive threshold window instead of the default 3..23 sweep
+    params.adaptiveThreshWinSizeMin = aruco_config.adaptive_thresh_win_size
+    params.adaptiveThreshWinSizeMax = aruco_config.adaptive_thresh_win_size
+    params.adaptiveThreshWinSizeStep = 10
+    params.cornerRefinementMethod = aruco_config.corner_refinement_method
+    params.minMarkerPerimeterRate = aruco_config.min_marker_perimeter_rate
+    params.polygonalApproxAccuracyRate = aruco_config.polygonal_approx_accuracy_rate
+    return params
+
+def _get_aruco_dictionary(dictionary_type: int):
+    """Get the shared predefined ArUco dictionary for dictionary_type"""
+    with _DETECTOR_CACHE_LOCK:
+        dictionary = _DICTIONARY_CACHE.get(dictionary_type)
+        if dictionary is None:
+            dictionary = cv2.aruco.getPredefinedDictionary(dictionary_type)
+            _DICTIONARY_CACHE[dictionary_type] = dictionary
+        return dictionary
+
+def _get_aruco_detector(aruco_config: ArUcoConfig):
+    """Get the shared ArUco detector for the dictionary and detector parameters in aruco_config"""
+    key = (
+        aruco_config.dictionary_type,
+        aruco_config.adaptive_thresh_win_size,
+        aruco_config.corner_refinement_method,
+        aruco_config.min_marker_perimeter_rate,
+        aruco_config.polygonal_approx_accuracy_rate
+    )
+    dictionary = _get_aruco_dictionary(aruco_config.dictionary_type)
+    with _DETECTOR_CACHE_LOCK:
+        detector = _DETECTOR_CACHE.get(key)
+        if detector is None:
+            detector = cv2.aruco.ArucoDetector(dictionary, create_detector_parameters(aruco_config))
+            _DETECTOR_CACHE[key] = detector
+        return detector
+
 def create_simulation_instance(tello_instance, config: Optional[Dict[str, Any]] = None) -> EnhancedSimulation:
     """Create and configure simulation instance"""
     return EnhancedSimulation(tello_instance, config)
@@ -363,5 +981,20 @@ def get_default_config() -> Dict[str, Any]:
         "aruco_dict": cv2.aruco.DICT_4X4_50,
         "marker_size": 0.05,
         "search_timeout": 30.0,
-        "approach_distance": 30
+        "approach_distance": 30,
+        "detection_scale": 0.5,
+        "roi_padding": 0.5,
+        "roi_max_misses": 5,
+        "camera_focal_length": 920.0,
+        "adaptive_thresh_win_size": 13,
+        "corner_refinement_method": cv2.aruco.CORNER_REFINE_NONE,
+        "min_marker_perimeter_rate": 0.05,
+        "polygonal_approx_accuracy_rate": 0.05,
+        "use_detection_process": False,
+        "detection_timeout": 1.0,
+        "detection_startup_timeout": 30.0,
+        "min_stddev": 0.0,
+        "debug_draw": False,
+        "use_gstreamer": False,
+        "gstreamer_pipeline": DEFAULT_GSTREAMER_PIPELINE
     } 
\ No newline at end of file
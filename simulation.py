@@ -2,6 +2,7 @@ import cv2
 import time
 import logging
 from djitellopy import Tello, TelloException
+from enhanced_simulation import ArUcoConfig, MarkerDetector
 
 logging.basicConfig(
     level=logging.INFO,
@@ -9,8 +10,28 @@ logging.basicConfig(
     datefmt='%H:%M:%S'
 )
 
-ARUCO_DICT = cv2.aruco.getPredefinedDictionary(cv2.aruco.DICT_4X4_50)
-DETECTOR = cv2.aruco.ArucoDetector(ARUCO_DICT, cv2.aruco.DetectorParameters())
+# Same detector profile, buffers and flat-frame gate as the enhanced simulation module
+MARKER_DETECTOR = MarkerDetector(ArUcoConfig())
+SHOW_PREVIEW = False
+
+def wait_for_new_frame(frame_reader, last_frame, timeout=0.5):
+    deadline = time.monotonic() + timeout
+    while True:
+        frame = frame_reader.frame
+        # The reader swaps in a new array per decoded frame, so identity means "already seen"
+        if frame is not None and frame is not last_frame:
+            return frame
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(1 / 60)
+
+# Timeouts and link drops are worth retrying; refusals like "out of range" or "Motor stop" are not.
+# djitellopy reports timeouts as "Did not receive a response after N seconds".
+TRANSIENT_ERRORS = ("timeout", "timed out", "did not receive", "no response", "not connected")
+
+def is_transient_error(error):
+    message = str(error).lower()
+    return any(keyword in message for keyword in TRANSIENT_ERRORS)
 
 def safe_command(command_func, *args, retries=3, delay=1, description="command"):
     for attempt in range(1, retries + 1):
@@ -19,6 +40,9 @@ def safe_command(command_func, *args, retries=3, delay=1, description="command")
             logging.info(f"{description.capitalize()} successful.")
             return True
         except TelloException as e:
+            if not is_transient_error(e):
+                logging.error(f"Could not complete {description}, error is not retryable: {e}")
+                return False
             logging.warning(f"Failed {description} attempt {attempt}/{retries}: {e}")
             time.sleep(delay)
     logging.error(f"Could not complete {description} after {retries} attempts.")
@@ -36,6 +60,17 @@ def get_battery_level(drone, retries=3, delay=1):
     logging.error("Failed to retrieve battery level after retries.")
     return None
 
+def shutdown(drone):
+    # Single attempt per step: a failing teardown should not stall for retries
+    if drone.is_flying:
+        safe_command(drone.land, retries=1, delay=0, description="emergency landing")
+    if drone.stream_on:
+        safe_command(drone.streamoff, retries=1, delay=0, description="stop video stream")
+    # Headless OpenCV builds raise on any HighGUI call, which would skip drone.end()
+    if SHOW_PREVIEW:
+        cv2.destroyAllWindows()
+    drone.end()
+
 def main():
     logging.info("Connecting to Tello drone...")
     drone = Tello()
@@ -71,27 +106,30 @@ def main():
             logging.warning("Battery low. Initiating ArUco marker search before landing.")
             found = False
             attempts = 0
+            last_frame = None
+            # Frames up to this time are still checked for a marker after a rotation
+            scan_deadline = 0.0
 
             while not found and attempts < 12:
-                frame = frame_reader.frame
+                frame = wait_for_new_frame(frame_reader, last_frame)
                 if frame is None:
                     logging.warning("No frame received from camera.")
-                    time.sleep(0.5)
                     attempts += 1
                     continue
+                last_frame = frame
 
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                corners, ids, _ = DETECTOR.detectMarkers(gray)
+                corners, ids = MARKER_DETECTOR.detect_global(frame)
 
-                display_frame = frame.copy()
-                if ids is not None:
-                    cv2.aruco.drawDetectedMarkers(display_frame, corners, ids)
+                if SHOW_PREVIEW:
+                    # The reader replaces this frame on the next decode, so draw on it directly
+                    if ids is not None:
+                        cv2.aruco.drawDetectedMarkers(frame, corners, ids)
 
-                cv2.imshow("Tello Camera Feed", display_frame)
-                if cv2.waitKey(1) & 0xFF == ord('q'):
-                    logging.info("Manual quit detected. Landing...")
-                    safe_command(drone.land, description="manual landing")
-                    break
+                    cv2.imshow("Tello Camera Feed", frame)
+                    if cv2.waitKey(1) & 0xFF == ord('q'):
+                        logging.info("Manual quit detected. Landing...")
+                        safe_command(drone.land, description="manual landing")
+                        break
 
                 if ids is not None:
                     logging.info("ArUco marker detected. Approaching marker...")
@@ -102,35 +140,27 @@ def main():
                     else:
                         logging.warning("Failed to approach marker.")
                     found = True
-                else:
+                elif time.monotonic() >= scan_deadline:
                     logging.info(f"Marker not found. Rotating... ({attempts + 1}/12)")
                     safe_command(drone.rotate_clockwise, 30, description="rotate clockwise")
-                    time.sleep(1)
-
-                attempts += 1
+                    # Detect on the frames that arrive while the camera settles instead of sleeping
+                    scan_deadline = time.monotonic() + 1
+                    attempts += 1
 
             if not found:
                 logging.warning("Marker not found after 12 attempts. Landing as fallback.")
                 safe_command(drone.land, description="fallback landing")
 
-        safe_command(drone.streamoff, description="stop video stream")
-        cv2.destroyAllWindows()
-        drone.end()
         logging.info("Drone mission completed successfully.")
 
     except KeyboardInterrupt:
         logging.info("Keyboard interrupt detected. Landing and shutting down...")
-        safe_command(drone.land, description="emergency landing")
-        safe_command(drone.streamoff, description="stop video stream")
-        cv2.destroyAllWindows()
-        drone.end()
 
     except Exception as e:
         logging.error(f"Unexpected error: {e}")
-        safe_command(drone.land, description="emergency landing")
-        safe_command(drone.streamoff, description="stop video stream")
-        cv2.destroyAllWindows()
-        drone.end()
+
+    finally:
+        shutdown(drone)
 
 if __name__ == "__main__":
     main()